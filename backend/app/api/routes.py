@@ -1,12 +1,17 @@
 
-from typing import Dict, Any
+import asyncio
+import hashlib
+from typing import Dict, Tuple, Any
 from copy import deepcopy
-from fastapi import APIRouter, HTTPException
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.responses import ORJSONResponse
 
 from app.models.schemas import (
-    Dataset, RiskScore, AnonymizedDataset, ComparisonResult,
+    Dataset, UserProfile, RiskScore, AnonymizedDataset, ComparisonResult,
     KAnonymityRequest, SpatialCloakingRequest, DifferentialPrivacyRequest,
-    PatternResult
+    ComparePrivacyRequest, PatternResult
 )
 from app.services.dataset_generator import generate_dataset
 from app.services.risk_calculator import (
@@ -17,33 +22,138 @@ from app.core.privacy_algorithms import (
     compare_coordinates
 )
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+
+_DATASET_CACHE_MAX = 8
+_dataset_cache: Dict[int | None, Tuple[Dataset, Dict[str, UserProfile]]] = {}
+_dataset_lock = asyncio.Lock()
+
+_RISK_CACHE_MAX = 64
+_risk_cache: Dict[bytes, Dict[str, RiskScore]] = {}
+
+_inflight: Dict[Tuple, "asyncio.Future"] = {}
+
+
+def _find_user(dataset: Dataset, user_id: str) -> UserProfile | None:
+
+    for cached_dataset, user_index in _dataset_cache.values():
+        if dataset is cached_dataset:
+            return user_index.get(user_id)
+    return next((u for u in dataset.users if u.user_id == user_id), None)
+
 
+def _dataset_fingerprint(dataset: Dataset) -> bytes:
+
+    coords = np.fromiter(
+        (c for u in dataset.users for p in u.locations for c in (p.lat, p.lon)),
+        dtype=np.float64
+    )
+    return hashlib.blake2b(coords.tobytes(), digest_size=16).digest()
+
+
+def _cached_dataset_risk(dataset: Dataset) -> Dict[str, RiskScore]:
+
+    key = _dataset_fingerprint(dataset)
+    risks = _risk_cache.get(key)
+    if risks is None:
+        risks = calculate_dataset_risk(dataset)
+        if len(_risk_cache) >= _RISK_CACHE_MAX:
+            _risk_cache.pop(next(iter(_risk_cache)))
+        _risk_cache[key] = risks
+    return risks
+
+
+async def _coalesced_anonymize(technique: str, anonymize, dataset: Dataset, params: Tuple):
+
+    # A classroom of students tends to submit the same dataset with the
+    # same parameters near-simultaneously; serve one shared computation
+    # to every request that arrives while it is in flight.
+    key = (technique, _dataset_fingerprint(dataset), params)
+    existing = _inflight.get(key)
+    if existing is not None:
+        return await existing
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        result = await asyncio.to_thread(anonymize, dataset, *params)
+        future.set_result(result)
+        return result
+    except Exception as exc:
+        future.set_exception(exc)
+        raise
+    finally:
+        _inflight.pop(key, None)
+
+
+def _aggregate_risks(risks: Dict[str, RiskScore], minmax=max) -> RiskScore:
+
+    total_overall = 0.0
+    total_uniqueness = 0.0
+    total_reident = 0.0
+    home_inferred = False
+    work_inferred = False
+    min_points = None
+
+    for risk in risks.values():
+        total_overall += risk.overall_risk
+        total_uniqueness += risk.uniqueness_score
+        total_reident += risk.reidentification_probability
+        home_inferred = home_inferred or risk.home_inferred
+        work_inferred = work_inferred or risk.work_inferred
+        if min_points is None:
+            min_points = risk.min_points_to_identify
+        else:
+            min_points = minmax(min_points, risk.min_points_to_identify)
+
+    count = len(risks)
+    return RiskScore(
+        overall_risk=total_overall / count,
+        uniqueness_score=total_uniqueness / count,
+        reidentification_probability=total_reident / count,
+        home_inferred=home_inferred,
+        work_inferred=work_inferred,
+        unique_patterns=[],
+        min_points_to_identify=min_points
+    )
 
-_cached_dataset: Dataset | None = None
 
 
 @router.get("/generate-dataset", response_model=Dataset)
 async def generate_dataset_endpoint(num_users: int | None = None, refresh: bool = False):
 
-    global _cached_dataset
-    
-    if _cached_dataset is None or refresh or num_users:
-        _cached_dataset = generate_dataset(num_users)
-    
-    return _cached_dataset
+    async with _dataset_lock:
+        if refresh or num_users not in _dataset_cache:
+            dataset = generate_dataset(num_users)
+            _dataset_cache.pop(num_users, None)
+            if len(_dataset_cache) >= _DATASET_CACHE_MAX:
+                _dataset_cache.pop(next(iter(_dataset_cache)))
+            _dataset_cache[num_users] = (
+                dataset, {u.user_id: u for u in dataset.users}
+            )
+        else:
+            # LRU touch: re-insert so the oldest entry is evicted first
+            _dataset_cache[num_users] = _dataset_cache.pop(num_users)
+
+        # Serialize with orjson directly; returning a Response skips the
+        # response-model re-validation pass over every point.
+        return Response(
+            content=_dataset_cache[num_users][0].to_orjson(),
+            media_type="application/json"
+        )
 
 
 @router.post("/calculate-risk")
 async def calculate_risk_endpoint(dataset: Dataset) -> Dict[str, RiskScore]:
 
-    return calculate_dataset_risk(dataset)
+    return _cached_dataset_risk(dataset)
 
 
 @router.post("/calculate-risk/{user_id}")
 async def calculate_user_risk_endpoint(user_id: str, dataset: Dataset) -> RiskScore:
 
-    user = next((u for u in dataset.users if u.user_id == user_id), None)
+    user = _find_user(dataset, user_id)
     if not user:
         raise HTTPException(status_code=404, detail=f"User {user_id} not found")
     
@@ -53,20 +163,14 @@ async def calculate_user_risk_endpoint(user_id: str, dataset: Dataset) -> RiskSc
 @router.post("/anonymize/k-anonymity", response_model=AnonymizedDataset)
 async def apply_k_anonymity_endpoint(request: KAnonymityRequest) -> AnonymizedDataset:
 
-    anonymized, utility_loss = apply_k_anonymity(request.dataset, request.k)
+    anonymized, utility_loss = await _coalesced_anonymize(
+        "k-anonymity", apply_k_anonymity, request.dataset, (request.k,)
+    )
     
 
-    risks = calculate_dataset_risk(anonymized)
+    risks = _cached_dataset_risk(anonymized)
 
-    avg_risk = RiskScore(
-        overall_risk=sum(r.overall_risk for r in risks.values()) / len(risks),
-        uniqueness_score=sum(r.uniqueness_score for r in risks.values()) / len(risks),
-        reidentification_probability=sum(r.reidentification_probability for r in risks.values()) / len(risks),
-        home_inferred=any(r.home_inferred for r in risks.values()),
-        work_inferred=any(r.work_inferred for r in risks.values()),
-        unique_patterns=[],
-        min_points_to_identify=max(r.min_points_to_identify for r in risks.values())
-    )
+    avg_risk = _aggregate_risks(risks)
     
     return AnonymizedDataset(
         dataset=anonymized,
@@ -80,19 +184,13 @@ async def apply_k_anonymity_endpoint(request: KAnonymityRequest) -> AnonymizedDa
 @router.post("/anonymize/spatial-cloaking", response_model=AnonymizedDataset)
 async def apply_spatial_cloaking_endpoint(request: SpatialCloakingRequest) -> AnonymizedDataset:
 
-    anonymized, utility_loss = apply_spatial_cloaking(request.dataset, request.radius_meters)
-    
-    risks = calculate_dataset_risk(anonymized)
-    avg_risk = RiskScore(
-        overall_risk=sum(r.overall_risk for r in risks.values()) / len(risks),
-        uniqueness_score=sum(r.uniqueness_score for r in risks.values()) / len(risks),
-        reidentification_probability=sum(r.reidentification_probability for r in risks.values()) / len(risks),
-        home_inferred=any(r.home_inferred for r in risks.values()),
-        work_inferred=any(r.work_inferred for r in risks.values()),
-        unique_patterns=[],
-        min_points_to_identify=max(r.min_points_to_identify for r in risks.values())
+    anonymized, utility_loss = await _coalesced_anonymize(
+        "spatial-cloaking", apply_spatial_cloaking, request.dataset, (request.radius_meters,)
     )
     
+    risks = _cached_dataset_risk(anonymized)
+    avg_risk = _aggregate_risks(risks)
+    
     return AnonymizedDataset(
         dataset=anonymized,
         technique="spatial-cloaking",
@@ -105,19 +203,13 @@ async def apply_spatial_cloaking_endpoint(request: SpatialCloakingRequest) -> An
 @router.post("/anonymize/differential-privacy", response_model=AnonymizedDataset)
 async def apply_differential_privacy_endpoint(request: DifferentialPrivacyRequest) -> AnonymizedDataset:
 
-    anonymized, utility_loss = apply_differential_privacy(request.dataset, request.epsilon)
-    
-    risks = calculate_dataset_risk(anonymized)
-    avg_risk = RiskScore(
-        overall_risk=sum(r.overall_risk for r in risks.values()) / len(risks),
-        uniqueness_score=sum(r.uniqueness_score for r in risks.values()) / len(risks),
-        reidentification_probability=sum(r.reidentification_probability for r in risks.values()) / len(risks),
-        home_inferred=any(r.home_inferred for r in risks.values()),
-        work_inferred=any(r.work_inferred for r in risks.values()),
-        unique_patterns=[],
-        min_points_to_identify=max(r.min_points_to_identify for r in risks.values())
+    anonymized, utility_loss = await _coalesced_anonymize(
+        "differential-privacy", apply_differential_privacy, request.dataset, (request.epsilon,)
     )
     
+    risks = _cached_dataset_risk(anonymized)
+    avg_risk = _aggregate_risks(risks)
+    
     return AnonymizedDataset(
         dataset=anonymized,
         technique="differential-privacy",
@@ -130,7 +222,7 @@ async def apply_differential_privacy_endpoint(request: DifferentialPrivacyReques
 @router.post("/identify-patterns/{user_id}", response_model=PatternResult)
 async def identify_patterns_endpoint(user_id: str, dataset: Dataset) -> PatternResult:
 
-    user = next((u for u in dataset.users if u.user_id == user_id), None)
+    user = _find_user(dataset, user_id)
     if not user:
         raise HTTPException(status_code=404, detail=f"User {user_id} not found")
     
@@ -138,45 +230,26 @@ async def identify_patterns_endpoint(user_id: str, dataset: Dataset) -> PatternR
 
 
 @router.post("/compare-privacy", response_model=ComparisonResult)
-async def compare_privacy_endpoint(
-    technique: str,
-    original_dataset: Dataset,
-    anonymized_dataset: Dataset,
-    parameters: Dict[str, Any]
-) -> ComparisonResult:
-
-
-    orig_risks = calculate_dataset_risk(original_dataset)
-    orig_avg = RiskScore(
-        overall_risk=sum(r.overall_risk for r in orig_risks.values()) / len(orig_risks),
-        uniqueness_score=sum(r.uniqueness_score for r in orig_risks.values()) / len(orig_risks),
-        reidentification_probability=sum(r.reidentification_probability for r in orig_risks.values()) / len(orig_risks),
-        home_inferred=any(r.home_inferred for r in orig_risks.values()),
-        work_inferred=any(r.work_inferred for r in orig_risks.values()),
-        unique_patterns=[],
-        min_points_to_identify=min(r.min_points_to_identify for r in orig_risks.values())
-    )
-    
+async def compare_privacy_endpoint(request: ComparePrivacyRequest) -> ComparisonResult:
 
-    anon_risks = calculate_dataset_risk(anonymized_dataset)
-    anon_avg = RiskScore(
-        overall_risk=sum(r.overall_risk for r in anon_risks.values()) / len(anon_risks),
-        uniqueness_score=sum(r.uniqueness_score for r in anon_risks.values()) / len(anon_risks),
-        reidentification_probability=sum(r.reidentification_probability for r in anon_risks.values()) / len(anon_risks),
-        home_inferred=any(r.home_inferred for r in anon_risks.values()),
-        work_inferred=any(r.work_inferred for r in anon_risks.values()),
-        unique_patterns=[],
-        min_points_to_identify=min(r.min_points_to_identify for r in anon_risks.values())
-    )
-    
 
-    distortion = compare_coordinates(original_dataset, anonymized_dataset)
-    
+    orig_risks = request.precomputed_original_risks or \
+        _cached_dataset_risk(request.original_dataset)
+    orig_avg = _aggregate_risks(orig_risks, minmax=min)
+
+
+    anon_risks = request.precomputed_anonymized_risks or \
+        _cached_dataset_risk(request.anonymized_dataset)
+    anon_avg = _aggregate_risks(anon_risks, minmax=min)
+
+
+    distortion = compare_coordinates(request.original_dataset, request.anonymized_dataset)
+
     return ComparisonResult(
         original_risk=orig_avg,
         anonymized_risk=anon_avg,
         risk_reduction=orig_avg.overall_risk - anon_avg.overall_risk,
         utility_loss=min(100, distortion.get("avg_distortion_meters", 0) / 10),
-        technique_used=technique,
-        parameters=parameters
+        technique_used=request.technique,
+        parameters=request.parameters
     )
@@ -0,0 +1,133 @@
+
+import math
+from typing import Tuple
+
+import numpy as np
+
+_EARTH_RADIUS_M = 6371000.0
+
+try:
+    from numba import njit, prange
+    _HAVE_NUMBA = True
+except ImportError:  # pragma: no cover - numba is in requirements.txt
+    _HAVE_NUMBA = False
+
+
+if _HAVE_NUMBA:
+
+    @njit(cache=True, fastmath=True, parallel=True)
+    def compare_dist(orig_xy: np.ndarray, anon_xy: np.ndarray) -> Tuple[float, float, float, float]:
+
+        n = orig_xy.shape[0]
+        total = 0.0
+        total_sq = 0.0
+        max_d2 = -np.inf
+        min_d2 = np.inf
+
+        # min/max/std reduce over squared distances; only the mean needs
+        # the per-element sqrt.
+        for i in prange(n):
+            d_lat = orig_xy[i, 0] - anon_xy[i, 0]
+            d_lon = orig_xy[i, 1] - anon_xy[i, 1]
+            d2 = d_lat * d_lat + d_lon * d_lon
+            total += np.sqrt(d2)
+            total_sq += d2
+            max_d2 = max(max_d2, d2)
+            min_d2 = min(min_d2, d2)
+
+        mean = total / n
+        std = np.sqrt(max(0.0, total_sq / n - mean * mean))
+
+        return mean, np.sqrt(max_d2), np.sqrt(min_d2), std
+
+    @njit(cache=True, fastmath=True)
+    def subset_matches(sub_sin_lat: np.ndarray, sub_cos_lat: np.ndarray,
+                       sub_sin_lon: np.ndarray, sub_cos_lon: np.ndarray,
+                       sub_ts: np.ndarray,
+                       sin_lat: np.ndarray, cos_lat: np.ndarray,
+                       sin_lon: np.ndarray, cos_lon: np.ndarray,
+                       ts: np.ndarray,
+                       dist_m: float, time_s: float) -> bool:
+
+        # True if every subset point has at least one location within
+        # dist_m meters and time_s seconds. ts must be sorted: binary
+        # search bounds the scan to the strict +/- time_s window.
+        # Coordinates arrive as precomputed sin/cos of the radians, so
+        # cos(d_phi)/cos(d_lam) come from angle-difference products and
+        # the distance check against the haversine threshold needs no
+        # per-pair trig at all.
+        a_max = math.sin(dist_m / (2 * _EARTH_RADIUS_M)) ** 2
+        for i in range(sub_ts.shape[0]):
+            lo = np.searchsorted(ts, sub_ts[i] - time_s, side='right')
+            hi = np.searchsorted(ts, sub_ts[i] + time_s, side='left')
+            matched = False
+            for j in range(lo, hi):
+                cos_d_phi = cos_lat[j] * sub_cos_lat[i] + sin_lat[j] * sub_sin_lat[i]
+                cos_d_lam = cos_lon[j] * sub_cos_lon[i] + sin_lon[j] * sub_sin_lon[i]
+                a = ((1 - cos_d_phi) / 2
+                     + sub_cos_lat[i] * cos_lat[j] * (1 - cos_d_lam) / 2)
+                if a < a_max:
+                    matched = True
+                    break
+            if not matched:
+                return False
+        return True
+
+else:
+
+    def compare_dist(orig_xy: np.ndarray, anon_xy: np.ndarray) -> Tuple[float, float, float, float]:
+
+        # Vectorized NumPy fallback: allocates the intermediate distance
+        # arrays the JIT kernel avoids, but stays off the per-point
+        # Python path. min/max/std come from the squared distances so the
+        # only full sqrt pass is the one the mean needs.
+        d_lat = orig_xy[:, 0] - anon_xy[:, 0]
+        d_lon = orig_xy[:, 1] - anon_xy[:, 1]
+        d2 = d_lat * d_lat + d_lon * d_lon
+
+        mean = float(np.sqrt(d2).mean())
+        std = np.sqrt(max(0.0, float(d2.mean()) - mean * mean))
+        return mean, float(np.sqrt(d2.max())), float(np.sqrt(d2.min())), std
+
+    def subset_matches(sub_sin_lat: np.ndarray, sub_cos_lat: np.ndarray,
+                       sub_sin_lon: np.ndarray, sub_cos_lon: np.ndarray,
+                       sub_ts: np.ndarray,
+                       sin_lat: np.ndarray, cos_lat: np.ndarray,
+                       sin_lon: np.ndarray, cos_lon: np.ndarray,
+                       ts: np.ndarray,
+                       dist_m: float, time_s: float) -> bool:
+
+        # ts must be sorted; searchsorted bounds each distance check to
+        # the strict +/- time_s window. The precomputed sin/cos arrays
+        # reduce the haversine comparison to products against a fixed
+        # threshold, with no trig in the loop.
+        a_max = math.sin(dist_m / (2 * _EARTH_RADIUS_M)) ** 2
+        for i in range(sub_ts.shape[0]):
+            lo = np.searchsorted(ts, sub_ts[i] - time_s, side='right')
+            hi = np.searchsorted(ts, sub_ts[i] + time_s, side='left')
+            if lo >= hi:
+                return False
+            cos_d_phi = cos_lat[lo:hi] * sub_cos_lat[i] + sin_lat[lo:hi] * sub_sin_lat[i]
+            cos_d_lam = cos_lon[lo:hi] * sub_cos_lon[i] + sin_lon[lo:hi] * sub_sin_lon[i]
+            a = ((1 - cos_d_phi) / 2
+                 + sub_cos_lat[i] * cos_lat[lo:hi] * (1 - cos_d_lam) / 2)
+            if not (a < a_max).any():
+                return False
+        return True
+
+
+def warmup() -> None:
+
+    # Trigger JIT compilation at import/startup rather than on the first
+    # request; with cache=True the compiled artifact persists on disk, so
+    # after the first process start this is just a cache load.
+    if _HAVE_NUMBA:
+        for dtype in (np.float64, np.float32):
+            z = np.zeros((1, 2), dtype=dtype)
+            compare_dist(z, z)
+        f64 = np.zeros(1, dtype=np.float64)
+        subset_matches(f64, f64, f64, f64, f64,
+                       f64, f64, f64, f64, f64, 200.0, 1800.0)
+
+
+warmup()
@@ -1,6 +1,9 @@
 
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from typing import List, Optional, Dict, Any, Tuple
+
+import numpy as np
+import orjson
+from pydantic import BaseModel, Field, PrivateAttr
 from datetime import datetime
 
 
@@ -19,6 +22,46 @@ class UserProfile(BaseModel):
     home_location: Optional[LocationPoint] = Field(None, description="Inferred home location")
     work_location: Optional[LocationPoint] = Field(None, description="Inferred work location")
 
+    _arrays: Optional[Tuple[np.ndarray, ...]] = PrivateAttr(default=None)
+    _trig: Optional[Tuple[np.ndarray, ...]] = PrivateAttr(default=None)
+
+    def as_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+
+        # SoA view of the location history, memoized on first access:
+        # (lats, lons, hours, weekdays, ts_epoch). Analysis code reads
+        # these contiguous arrays instead of touching every LocationPoint.
+        if self._arrays is None:
+            count = len(self.locations)
+            self._arrays = (
+                np.fromiter((p.lat for p in self.locations),
+                            dtype=np.float32, count=count),
+                np.fromiter((p.lon for p in self.locations),
+                            dtype=np.float32, count=count),
+                np.fromiter((p.timestamp.hour for p in self.locations),
+                            dtype=np.int8, count=count),
+                np.fromiter((p.timestamp.weekday() for p in self.locations),
+                            dtype=np.int8, count=count),
+                np.fromiter((p.timestamp.timestamp() for p in self.locations),
+                            dtype=np.float64, count=count),
+            )
+        return self._arrays
+
+    def trig_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+
+        # (sin_lat, cos_lat, sin_lon, cos_lon) of the coordinate
+        # radians, memoized like as_arrays(). Distance kernels built on
+        # these compare haversine terms without per-pair trig; float64
+        # because (1 - cos) of a ~200m angle is below float32 epsilon.
+        if self._trig is None:
+            lats, lons = self.as_arrays()[:2]
+            lat_rad = np.radians(lats.astype(np.float64))
+            lon_rad = np.radians(lons.astype(np.float64))
+            self._trig = (
+                np.sin(lat_rad), np.cos(lat_rad),
+                np.sin(lon_rad), np.cos(lon_rad),
+            )
+        return self._trig
+
 
 class Dataset(BaseModel):
 
@@ -26,6 +69,16 @@ class Dataset(BaseModel):
     generated_at: datetime
     city: str = "Calgary"
 
+    def to_orjson(self) -> bytes:
+
+        # orjson serializes datetimes and numpy scalars natively, which
+        # is much cheaper than the default encoder once a dataset holds
+        # tens of thousands of points.
+        return orjson.dumps(
+            self.model_dump(),
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+        )
+
 
 class RiskScore(BaseModel):
 
@@ -67,6 +120,20 @@ class AnonymizedDataset(BaseModel):
     new_risk_score: RiskScore
 
 
+class ComparePrivacyRequest(BaseModel):
+
+    technique: str
+    original_dataset: Dataset
+    anonymized_dataset: Dataset
+    parameters: Dict[str, Any]
+    precomputed_original_risks: Optional[Dict[str, RiskScore]] = Field(
+        None, description="Risks already computed by a prior /calculate-risk call"
+    )
+    precomputed_anonymized_risks: Optional[Dict[str, RiskScore]] = Field(
+        None, description="Risks already computed by a prior /anonymize call"
+    )
+
+
 class ComparisonResult(BaseModel):
 
     original_risk: RiskScore
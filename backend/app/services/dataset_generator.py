@@ -1,5 +1,7 @@
 
-import random
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from typing import List, Tuple, Optional
 import numpy as np
@@ -12,206 +14,240 @@ from app.core.config import (
 from app.models.schemas import LocationPoint, UserProfile, Dataset
 
 
-def generate_home_location() -> Tuple[float, float]:
+RNG = np.random.default_rng()
 
 
-    residential_areas = [
-        (51.05, -114.11),  # Kensington
-        (51.08, -114.08),  # North Hill
-        (51.02, -114.08),  # Beltline
-        (50.95, -114.07),  # South Calgary
-        (51.10, -114.15),  # Varsity
-        (51.03, -114.03),  # Inglewood
-        (51.06, -114.05),  # Bridgeland
-        (51.00, -114.05),  # Mission
-        (51.12, -114.20),  # Bowness
-    ]
-    
-    base = random.choice(residential_areas)
-    lat = base[0] + random.gauss(0, 0.01)
-    lon = base[1] + random.gauss(0, 0.01)
-    
-    return (
-        max(min(lat, CITY_BOUNDS["max_lat"]), CITY_BOUNDS["min_lat"]),
-        max(min(lon, CITY_BOUNDS["max_lon"]), CITY_BOUNDS["min_lon"])
-    )
-
+_RESIDENTIAL_AREAS = np.array([
+    (51.05, -114.11),  # Kensington
+    (51.08, -114.08),  # North Hill
+    (51.02, -114.08),  # Beltline
+    (50.95, -114.07),  # South Calgary
+    (51.10, -114.15),  # Varsity
+    (51.03, -114.03),  # Inglewood
+    (51.06, -114.05),  # Bridgeland
+    (51.00, -114.05),  # Mission
+    (51.12, -114.20),  # Bowness
+])
 
-def generate_work_location() -> Tuple[float, float]:
+_WORK_AREAS = np.array([
+    CALGARY_LANDMARKS.downtown,
+    CALGARY_LANDMARKS.university,
+    CALGARY_LANDMARKS.south_health_campus,
+    (51.05, -114.07),  # Downtown core
+    (51.04, -114.06),  # Stephen Ave area
+    (51.08, -114.13),  # University area
+])
 
-    work_areas = [
-        CALGARY_LANDMARKS["downtown"],
-        CALGARY_LANDMARKS["university"],
-        CALGARY_LANDMARKS["south_health_campus"],
-        (51.05, -114.07),  # Downtown core
-        (51.04, -114.06),  # Stephen Ave area
-        (51.08, -114.13),  # University area
-    ]
-    
-    base = random.choice(work_areas)
-    lat = base[0] + random.gauss(0, 0.005)
-    lon = base[1] + random.gauss(0, 0.005)
-    
-    return (
-        max(min(lat, CITY_BOUNDS["max_lat"]), CITY_BOUNDS["min_lat"]),
-        max(min(lon, CITY_BOUNDS["max_lon"]), CITY_BOUNDS["min_lon"])
-    )
+_LEISURE_SPOTS = np.array(list(CALGARY_LANDMARKS))
 
+_BOUNDS_LO = np.array([CITY_BOUNDS.min_lat, CITY_BOUNDS.min_lon])
+_BOUNDS_HI = np.array([CITY_BOUNDS.max_lat, CITY_BOUNDS.max_lon])
 
-def generate_leisure_locations(n: int = 3) -> List[Tuple[float, float]]:
 
-    leisure_spots = list(CALGARY_LANDMARKS.values())
-    selected = random.sample(leisure_spots, min(n, len(leisure_spots)))
-    
+def _draw_user_anchors(
+    num_leisure: int, include_work: bool
+) -> Tuple[np.ndarray, Optional[np.ndarray], np.ndarray]:
 
-    result = []
-    for spot in selected:
-        lat = spot[0] + random.gauss(0, 0.003)
-        lon = spot[1] + random.gauss(0, 0.003)
-        result.append((
-            max(min(lat, CITY_BOUNDS["max_lat"]), CITY_BOUNDS["min_lat"]),
-            max(min(lon, CITY_BOUNDS["max_lon"]), CITY_BOUNDS["min_lon"])
-        ))
-    return result
+    # Stack every anchor base with its own sigma so one normal draw and
+    # one clip cover home, work and all leisure spots.
+    rows = [_RESIDENTIAL_AREAS[RNG.integers(len(_RESIDENTIAL_AREAS))]]
+    sigmas = [0.01]
 
+    if include_work:
+        rows.append(_WORK_AREAS[RNG.integers(len(_WORK_AREAS))])
+        sigmas.append(0.005)
 
-def interpolate_transit(start: Tuple[float, float], end: Tuple[float, float], 
-                        num_points: int = 3) -> List[Tuple[float, float]]:
+    count = min(num_leisure, len(_LEISURE_SPOTS))
+    leisure_idx = RNG.choice(len(_LEISURE_SPOTS), size=count, replace=False)
+    rows.extend(_LEISURE_SPOTS[leisure_idx])
+    sigmas.extend([0.003] * count)
 
-    points = []
-    for i in range(1, num_points + 1):
-        t = i / (num_points + 1)
-        lat = start[0] + t * (end[0] - start[0]) + random.gauss(0, 0.002)
-        lon = start[1] + t * (end[1] - start[1]) + random.gauss(0, 0.002)
-        points.append((lat, lon))
-    return points
+    bases = np.vstack(rows)
+    pts = np.clip(
+        bases + RNG.normal(0, 1, bases.shape) * np.array(sigmas)[:, None],
+        _BOUNDS_LO, _BOUNDS_HI
+    )
 
+    # Anchors stay float64 2-vectors end to end; conversion to plain
+    # floats happens only at the LocationPoint boundary.
+    home = pts[0]
+    work = pts[1] if include_work else None
+    leisure = pts[2:] if include_work else pts[1:]
+    return home, work, leisure
+
+
+_MIN_NS = 60 * 1_000_000_000
+_HOUR_NS = 60 * _MIN_NS
+_DAY_NS = 24 * _HOUR_NS
+
+_WORK_OFFSETS_NS = np.arange(0, 10, 2) * _HOUR_NS
+
+
+def _commute_points(
+    start: np.ndarray, end: np.ndarray,
+    bases_ns: np.ndarray, counts: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+    # Transit counts vary per day, so the per-day rows are flattened with
+    # repeat/arange and both commute directions interpolate across every
+    # day in one shot.
+    total = int(counts.sum())
+    day_idx = np.repeat(np.arange(len(counts)), counts)
+    steps = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    t = (steps + 1) / (counts[day_idx] + 1)
+    delta = end - start
+    lats = start[0] + t * delta[0] + RNG.normal(0, 0.002, total)
+    lons = start[1] + t * delta[1] + RNG.normal(0, 0.002, total)
+    ts = bases_ns[day_idx] + (steps + 1) * (10 * _MIN_NS)
+    return lats, lons, ts
+
+
+def _generate_user_schedule(
+    home: np.ndarray,
+    work: Optional[np.ndarray],
+    leisure_spots: np.ndarray,
+    day_bases_ns: np.ndarray,
+    is_weekday: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+
+    # Whole-user schedule in a handful of array ops: each segment kind
+    # (home readings, commutes, work hours, leisure trips) is emitted for
+    # all of its days at once, then everything is concatenated.
+    num_days = len(day_bases_ns)
+
+    seg_lats: List[np.ndarray] = []
+    seg_lons: List[np.ndarray] = []
+    seg_ts: List[np.ndarray] = []
+    location_types: List[str] = []
+
+    def emit(lats, lons, ts, location_type: str) -> None:
+        # float32 keeps ~1m resolution at this latitude and halves the
+        # memory traffic for everything downstream.
+        seg_lats.append(np.asarray(lats, dtype=np.float32).ravel())
+        seg_lons.append(np.asarray(lons, dtype=np.float32).ravel())
+        seg_ts.append(np.asarray(ts, dtype=np.int64).ravel())
+        location_types.extend([location_type] * seg_ts[-1].size)
+
+    # One batched draw covers the morning reading and both evening readings
+    home_noise = RNG.normal(0, 0.0005, (num_days, 3, 2))
+
+    morning_ts = (day_bases_ns
+                  + RNG.integers(6, 8, num_days) * _HOUR_NS
+                  + RNG.integers(0, 60, num_days) * _MIN_NS)
+    emit(home[0] + home_noise[:, 0, 0], home[1] + home_noise[:, 0, 1],
+         morning_ts, "home")
+
+    work_days = np.flatnonzero(is_weekday) if work is not None else np.empty(0, dtype=np.int64)
+    if work_days.size:
+        wd = day_bases_ns[work_days]
+        n_work = wd.size
+
+        commute_ns = (wd + RNG.integers(7, 9, n_work) * _HOUR_NS
+                      + RNG.integers(30, 60, n_work) * _MIN_NS)
+        emit(*_commute_points(home, work, commute_ns, RNG.integers(2, 5, n_work)),
+             "transit")
+
+        work_ts = (wd + 9 * _HOUR_NS
+                   + RNG.integers(0, 31, n_work) * _MIN_NS)[:, None] + _WORK_OFFSETS_NS
+        work_noise = RNG.normal(0, 0.0003, (n_work, 5, 2))
+        emit(work[0] + work_noise[:, :, 0], work[1] + work_noise[:, :, 1],
+             work_ts, "work")
+
+        commute_home_ns = (wd + 17 * _HOUR_NS
+                           + RNG.integers(0, 31, n_work) * _MIN_NS)
+        emit(*_commute_points(work, home, commute_home_ns, RNG.integers(2, 5, n_work)),
+             "transit")
+
+    off_days = np.flatnonzero(~is_weekday) if work is not None else np.arange(num_days)
+    if off_days.size and len(leisure_spots):
+        active = off_days[RNG.random(off_days.size) > 0.3]
+        if active.size:
+            n_trips = active.size
+            spots = leisure_spots[RNG.integers(len(leisure_spots), size=n_trips)]
+            visit_ns = (day_bases_ns[active]
+                        + RNG.integers(10, 16, n_trips) * _HOUR_NS
+                        + RNG.integers(0, 60, n_trips) * _MIN_NS)
+
+            t = np.array([1, 2]) / 3
+            emit(
+                home[0] + t * (spots[:, 0:1] - home[0]) + RNG.normal(0, 0.002, (n_trips, 2)),
+                home[1] + t * (spots[:, 1:2] - home[1]) + RNG.normal(0, 0.002, (n_trips, 2)),
+                visit_ns[:, None] + np.array([5, 10]) * _MIN_NS,
+                "transit"
+            )
+
+            leisure_noise = RNG.normal(0, 0.0005, (n_trips, 2, 2))
+            emit(
+                spots[:, 0:1] + leisure_noise[:, :, 0],
+                spots[:, 1:2] + leisure_noise[:, :, 1],
+                visit_ns[:, None] + np.array([30 * _MIN_NS, 2 * _HOUR_NS]),
+                "leisure"
+            )
+
+    evening_ts = (day_bases_ns[:, None]
+                  + np.array([19, 21]) * _HOUR_NS
+                  + RNG.integers(0, 60, (num_days, 2)) * _MIN_NS)
+    emit(home[0] + home_noise[:, 1:, 0], home[1] + home_noise[:, 1:, 1],
+         evening_ts, "home")
 
-def generate_day_trajectory(
-    date: datetime,
-    home: Tuple[float, float],
-    work: Optional[Tuple[float, float]],
-    leisure_spots: List[Tuple[float, float]],
-    is_weekday: bool
-) -> List[LocationPoint]:
+    return (
+        np.concatenate(seg_lats),
+        np.concatenate(seg_lons),
+        np.concatenate(seg_ts),
+        location_types
+    )
 
-    points = []
-    
 
-    morning_time = date.replace(hour=random.randint(6, 7), minute=random.randint(0, 59))
-    points.append(LocationPoint(
-        lat=home[0] + random.gauss(0, 0.0005),
-        lon=home[1] + random.gauss(0, 0.0005),
-        timestamp=morning_time,
-        location_type="home"
-    ))
-    
-    if is_weekday and work:
-
-        commute_start = date.replace(hour=random.randint(7, 8), minute=random.randint(30, 59))
-        transit_points = interpolate_transit(home, work, random.randint(2, 4))
-        for i, tp in enumerate(transit_points):
-            points.append(LocationPoint(
-                lat=tp[0],
-                lon=tp[1],
-                timestamp=commute_start + timedelta(minutes=10 * (i + 1)),
-                location_type="transit"
-            ))
-        
-
-        work_start = date.replace(hour=9, minute=random.randint(0, 30))
-        for hour_offset in [0, 2, 4, 6, 8]:
-            points.append(LocationPoint(
-                lat=work[0] + random.gauss(0, 0.0003),
-                lon=work[1] + random.gauss(0, 0.0003),
-                timestamp=work_start + timedelta(hours=hour_offset),
-                location_type="work"
-            ))
-        
-
-        commute_home_start = date.replace(hour=17, minute=random.randint(0, 30))
-        transit_points = interpolate_transit(work, home, random.randint(2, 4))
-        for i, tp in enumerate(transit_points):
-            points.append(LocationPoint(
-                lat=tp[0],
-                lon=tp[1],
-                timestamp=commute_home_start + timedelta(minutes=10 * (i + 1)),
-                location_type="transit"
-            ))
-    else:
+def generate_user_profile(user_id: str, num_days: int = 14) -> UserProfile:
 
-        if leisure_spots and random.random() > 0.3:
-            spot = random.choice(leisure_spots)
-            visit_time = date.replace(hour=random.randint(10, 15), minute=random.randint(0, 59))
-            
-
-            transit_points = interpolate_transit(home, spot, 2)
-            for i, tp in enumerate(transit_points):
-                points.append(LocationPoint(
-                    lat=tp[0],
-                    lon=tp[1],
-                    timestamp=visit_time + timedelta(minutes=5 * (i + 1)),
-                    location_type="transit"
-                ))
-            
-
-            points.append(LocationPoint(
-                lat=spot[0] + random.gauss(0, 0.0005),
-                lon=spot[1] + random.gauss(0, 0.0005),
-                timestamp=visit_time + timedelta(minutes=30),
-                location_type="leisure"
-            ))
-            points.append(LocationPoint(
-                lat=spot[0] + random.gauss(0, 0.0005),
-                lon=spot[1] + random.gauss(0, 0.0005),
-                timestamp=visit_time + timedelta(hours=2),
-                location_type="leisure"
-            ))
-    
-
-    for hour in [19, 21]:
-        evening_time = date.replace(hour=hour, minute=random.randint(0, 59))
-        points.append(LocationPoint(
-            lat=home[0] + random.gauss(0, 0.0005),
-            lon=home[1] + random.gauss(0, 0.0005),
-            timestamp=evening_time,
-            location_type="home"
-        ))
-    
-    return sorted(points, key=lambda p: p.timestamp)
+    include_work = RNG.random() > 0.15
+    home, work, leisure_spots = _draw_user_anchors(int(RNG.integers(2, 6)), include_work)
 
+    midnight = (datetime.now() - timedelta(days=num_days)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    start_ns = int(np.datetime64(midnight, "ns").astype(np.int64))
+    day_bases_ns = start_ns + np.arange(num_days) * _DAY_NS
+    is_weekday = (midnight.weekday() + np.arange(num_days)) % 7 < 5
 
-def generate_user_profile(user_id: str, num_days: int = 14) -> UserProfile:
+    lats, lons, ts_ns, location_types = _generate_user_schedule(
+        home, work, leisure_spots, day_bases_ns, is_weekday
+    )
 
-    home = generate_home_location()
-    work = generate_work_location() if random.random() > 0.15 else None
-    leisure_spots = generate_leisure_locations(random.randint(2, 5))
-    
-    all_locations = []
-    start_date = datetime.now() - timedelta(days=num_days)
-    
-    for day_offset in range(num_days):
-        current_date = start_date + timedelta(days=day_offset)
-        is_weekday = current_date.weekday() < 5
-        
-        day_points = generate_day_trajectory(
-            current_date, home, work, leisure_spots, is_weekday
+    # One argsort over the whole history replaces the per-day sorts;
+    # the int64 nanosecond array converts back to datetime objects in a
+    # single C-level pass at the model boundary.
+    order = np.argsort(ts_ns)
+    datetimes = ts_ns[order].view("datetime64[ns]").astype("datetime64[us]").tolist()
+
+    # tolist() hands the models plain Python floats; float32 scalars in
+    # the fields would trip pydantic's serializer.
+    all_locations = [
+        LocationPoint.model_construct(
+            lat=lat,
+            lon=lon,
+            timestamp=ts,
+            location_type=location_types[i]
         )
-        all_locations.extend(day_points)
-    
+        for i, lat, lon, ts in zip(
+            order, lats[order].tolist(), lons[order].tolist(), datetimes
+        )
+    ]
 
-    home_point = LocationPoint(
+
+    home_point = LocationPoint.model_construct(
         lat=home[0], lon=home[1],
         timestamp=datetime.now(),
         location_type="home"
     )
-    work_point = LocationPoint(
+    work_point = LocationPoint.model_construct(
         lat=work[0], lon=work[1],
         timestamp=datetime.now(),
         location_type="work"
-    ) if work else None
-    
-    return UserProfile(
+    ) if work is not None else None
+
+    return UserProfile.model_construct(
         user_id=user_id,
         locations=all_locations,
         home_location=home_point,
@@ -219,19 +255,50 @@ def generate_user_profile(user_id: str, num_days: int = 14) -> UserProfile:
     )
 
 
-def generate_dataset(num_users: Optional[int] = None) -> Dataset:
+_PARALLEL_MIN_USERS = 8
+
+
+def _generate_one(task: Tuple[str, int, np.random.SeedSequence]) -> UserProfile:
+
+    user_id, num_days, child_ss = task
+
+    # Each task carries its own spawned SeedSequence, so workers never
+    # share generator state and a given task always produces the same
+    # user regardless of scheduling.
+    global RNG
+    RNG = np.random.default_rng(child_ss)
+
+    return generate_user_profile(user_id, num_days)
+
+
+def generate_dataset(num_users: Optional[int] = None,
+                     seed: Optional[int] = None) -> Dataset:
+
+    ss = np.random.SeedSequence(seed)
+    master = np.random.default_rng(ss)
 
     if num_users is None:
-        num_users = random.randint(NUM_USERS_MIN, NUM_USERS_MAX)
-    
-    users = []
-    for i in range(num_users):
-        user_id = f"user_{i+1:03d}"
-        num_days = random.randint(7, 21)
-        user_profile = generate_user_profile(user_id, num_days)
-        users.append(user_profile)
-    
-    return Dataset(
+        num_users = int(master.integers(NUM_USERS_MIN, NUM_USERS_MAX + 1))
+
+    tasks = [
+        (f"user_{i+1:03d}", int(master.integers(7, 22)), child)
+        for i, child in enumerate(ss.spawn(num_users))
+    ]
+
+    if num_users < _PARALLEL_MIN_USERS:
+        # Not worth the pool spin-up cost for a handful of users
+        users = [_generate_one(task) for task in tasks]
+    else:
+        # Spawned (not forked) workers: the API process holds JIT thread
+        # state that forked children inherit and never unwind cleanly.
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(mp_context=ctx) as executor:
+            chunksize = max(1, num_users // ((os.cpu_count() or 1) * 4))
+            users = list(executor.map(_generate_one, tasks, chunksize=chunksize))
+
+    # Everything above is generator-produced and already well-typed, so
+    # validated construction is left to the API boundary.
+    return Dataset.model_construct(
         users=users,
         generated_at=datetime.now(),
         city="Calgary"
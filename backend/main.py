@@ -1,33 +1,54 @@
 
-from fastapi import FastAPI
+import orjson
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.api.routes import router
 
 app = FastAPI(
     title="Location Privacy Teaching System API",
     description="API for demonstrating location data re-identification risks and privacy protection techniques",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 
+# Browsers refuse credentialed requests against a wildcard origin, so
+# "*" only forced a failing preflight; max_age lets them cache the
+# preflight response for a day.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:5173", "http://localhost:3000", "*"],
+    allow_origins=["http://localhost:5173", "http://localhost:3000"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=86400,
 )
 
 
 app.include_router(router, prefix="/api")
 
 
+# Both payloads are constant, so serialize them once at import and hand
+# the same response body back on every request.
+_ROOT_RESPONSE = Response(
+    content=orjson.dumps(
+        {"message": "Location Privacy Teaching System API", "version": "1.0.0"}
+    ),
+    media_type="application/json"
+)
+_HEALTH_RESPONSE = Response(
+    content=orjson.dumps({"status": "healthy"}),
+    media_type="application/json"
+)
+
+
 @app.get("/")
 async def root():
-    return {"message": "Location Privacy Teaching System API", "version": "1.0.0"}
+    return _ROOT_RESPONSE
 
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return _HEALTH_RESPONSE